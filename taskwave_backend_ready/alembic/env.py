@@ -6,7 +6,7 @@ from sqlalchemy import engine_from_config, pool
 from alembic import context
 
 from app.db.base import Base
-from app.models import user, subject, schedule, material, upload  # noqa
+from app.models import user, subject, schedule, material, upload, lease  # noqa
 
 config = context.config
 if 'DATABASE_URL' in os.environ:
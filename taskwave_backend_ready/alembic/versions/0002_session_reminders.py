@@ -0,0 +1,35 @@
+
+"""session reminders: starts_at/updated_at indexes and scheduler lease
+
+Revision ID: 0002_session_reminders
+Revises: 0001_init
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0002_session_reminders'
+down_revision = '0001_init'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('sessions', sa.Column('reminded_starts_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('sessions', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_sessions_starts_at', 'sessions', ['starts_at'], unique=False)
+    op.create_index('ix_sessions_updated_at', 'sessions', ['updated_at'], unique=False)
+
+    op.create_table('scheduler_leases',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('holder', sa.String(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    )
+
+def downgrade() -> None:
+    op.drop_table('scheduler_leases')
+    op.drop_index('ix_sessions_updated_at', table_name='sessions')
+    op.drop_index('ix_sessions_starts_at', table_name='sessions')
+    with op.batch_alter_table('sessions') as batch:
+        batch.drop_column('updated_at')
+        batch.drop_column('reminded_starts_at')
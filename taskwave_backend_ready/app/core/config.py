@@ -20,6 +20,11 @@ class Settings(BaseSettings):
     AWS_ACCESS_KEY_ID: str | None = None
     AWS_SECRET_ACCESS_KEY: str | None = None
     S3_BASE_URL: str | None = None
+    REMINDERS_ENABLED: bool = False
+    REMINDER_NOTIFIER: str = "log"
+    REMINDER_LEAD_MINUTES: int = 10
+    REMINDER_WINDOW_MINUTES: int = 60
+    REMINDER_LEASE_SECONDS: int = 30
 
     @field_validator("CORS_ORIGINS", mode="before")
     @classmethod
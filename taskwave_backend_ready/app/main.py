@@ -1,4 +1,5 @@
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -10,9 +11,21 @@ from app.routers.materials import router as materials_router
 from app.routers.uploads import router as uploads_router
 from app.routers.schedules import router as schedules_router
 from app.routers.misc import router as misc_router
+from app.services.reminders import ReminderScheduler
 import os
 
-app = FastAPI(title=settings.APP_NAME)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    scheduler = ReminderScheduler() if settings.REMINDERS_ENABLED else None
+    if scheduler:
+        scheduler.start()
+    try:
+        yield
+    finally:
+        if scheduler:
+            scheduler.stop()
+
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -1,5 +1,6 @@
 
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from datetime import datetime, timezone
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from sqlalchemy import String, Integer, ForeignKey, DateTime, Text
 from app.db.base import Base
 
@@ -16,6 +17,19 @@ class Session(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     week_id: Mapped[int] = mapped_column(Integer, ForeignKey("weeks.id", ondelete="CASCADE"))
     title: Mapped[str] = mapped_column(String, nullable=False)
-    starts_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    starts_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
     note: Mapped[str | None] = mapped_column(Text, nullable=True)
+    reminded_starts_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Set client-side so the reminder scheduler can poll it against app-side UTC timestamps.
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, index=True,
+        default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc),
+    )
     week = relationship("Week", back_populates="sessions")
+
+    @validates("starts_at", "reminded_starts_at")
+    def _to_utc(self, key, value):
+        # SQLite drops the offset from DateTime(timezone=True), so store UTC.
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value
@@ -0,0 +1,408 @@
+
+import heapq
+from abc import ABC, abstractmethod
+import logging
+import os
+import socket
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+from uuid import uuid4
+from sqlalchemy import event, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session as OrmSession
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.lease import SchedulerLease
+from app.models.schedule import Week, Session as SessionModel
+from app.models.subject import Subject
+from app.models.user import User
+
+log = logging.getLogger("taskwave.reminders")
+
+LEASE_NAME = "session-reminders"
+# Rows stamped just before the watermark may commit after it; re-read them.
+POLL_SLACK = timedelta(seconds=5)
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _as_utc(dt: datetime) -> datetime:
+    # SQLite hands back naive datetimes; Session._to_utc stores them as UTC.
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+@dataclass
+class Reminder:
+    session_id: int
+    session_title: str
+    subject_title: str
+    user_id: str
+    email: str
+    starts_at: datetime
+
+class Notifier(ABC):
+    @abstractmethod
+    def send(self, reminder: Reminder) -> None:
+        ...
+
+class LogNotifier(Notifier):
+    def send(self, reminder: Reminder) -> None:
+        log.info("reminder to user %s: %s / %s at %s", reminder.user_id, reminder.subject_title, reminder.session_title, reminder.starts_at.isoformat())
+
+class InMemoryNotifier(Notifier):
+    """Keeps every reminder in memory; pass it in directly, for tests."""
+
+    def __init__(self) -> None:
+        self.sent: list[Reminder] = []
+
+    def send(self, reminder: Reminder) -> None:
+        self.sent.append(reminder)
+
+def get_notifier(name: str | None = None) -> Notifier:
+    name = (name or settings.REMINDER_NOTIFIER).lower()
+    if name == "log":
+        return LogNotifier()
+    raise ValueError(f"Unknown reminder notifier: {name}")
+
+class DbLease:
+    """Row-level lease so only one process in a deployment schedules reminders."""
+
+    def __init__(self, session_factory=SessionLocal, name: str = LEASE_NAME, ttl_seconds: int | None = None) -> None:
+        self.session_factory = session_factory
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_seconds if ttl_seconds is not None else settings.REMINDER_LEASE_SECONDS)
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+    def acquire(self, now: datetime) -> bool:
+        expires = now + self.ttl
+        with self.session_factory() as db:
+            res = db.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name)
+                .where((SchedulerLease.holder == self.holder) | (SchedulerLease.expires_at < now))
+                .values(holder=self.holder, expires_at=expires)
+            )
+            if res.rowcount:
+                db.commit()
+                return True
+            if db.get(SchedulerLease, self.name) is not None:
+                db.rollback()
+                return False
+            db.add(SchedulerLease(name=self.name, holder=self.holder, expires_at=expires))
+            try:
+                db.commit()
+                return True
+            except IntegrityError:
+                db.rollback()
+                return False
+
+    def release(self) -> None:
+        with self.session_factory() as db:
+            db.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name, SchedulerLease.holder == self.holder)
+                .values(expires_at=datetime(1970, 1, 1, tzinfo=timezone.utc))
+            )
+            db.commit()
+
+class ReminderScheduler:
+    """Fires a reminder ``lead`` before each session starts.
+
+    Only sessions whose reminder falls inside the next ``window`` are loaded
+    (an indexed range query on ``starts_at``) and kept in a min-heap keyed by
+    fire time. Committed writes in this process are applied straight away;
+    writes from other processes are picked up each tick by polling the indexed
+    ``updated_at`` column. Sessions are claimed via ``reminded_starts_at``
+    before sending, so a stale entry or a new leader never re-sends.
+    """
+
+    def __init__(
+        self,
+        notifier: Notifier | None = None,
+        session_factory=SessionLocal,
+        lease: DbLease | None = None,
+        lead_minutes: int | None = None,
+        window_minutes: int | None = None,
+        clock: Callable[[], datetime] = utcnow,
+    ) -> None:
+        self.notifier = notifier or get_notifier()
+        self.session_factory = session_factory
+        self.lease = lease or DbLease(session_factory)
+        self.lead = timedelta(minutes=lead_minutes if lead_minutes is not None else settings.REMINDER_LEAD_MINUTES)
+        self.window = timedelta(minutes=window_minutes if window_minutes is not None else settings.REMINDER_WINDOW_MINUTES)
+        # Sessions that started less than one lease interval ago still get a
+        # (late) reminder, covering missed ticks and leader hand-over.
+        self.overlap = self.lease.ttl
+        self.retry = self.lease.ttl / 3
+        self.clock = clock
+        self.is_leader = False
+        self._heap: list[tuple[datetime, int, datetime]] = []
+        self._pending: dict[int, datetime] = {}
+        self._horizon: datetime | None = None
+        self._refilled_at: datetime | None = None
+        self._watermark: datetime | None = None
+        self._info_key = f"reminders:{id(self)}"
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+    # -- heap maintenance -------------------------------------------------
+
+    def _push(self, session_id: int, starts_at: datetime, fire_at: datetime | None = None) -> bool:
+        if self._pending.get(session_id) == starts_at and fire_at is None:
+            return False
+        # Superseded heap entries are skipped lazily when popped.
+        self._pending[session_id] = starts_at
+        heapq.heappush(self._heap, (fire_at or starts_at - self.lead, session_id, starts_at))
+        return True
+
+    def _apply(self, session_id: int, starts_at: datetime | None, now: datetime) -> bool:
+        starts_at = _as_utc(starts_at) if starts_at is not None else None
+        if starts_at is None or self._horizon is None or not (now - self.overlap < starts_at <= self._horizon):
+            self._pending.pop(session_id, None)
+            return False
+        return self._push(session_id, starts_at)
+
+    def upsert(self, session_id: int, starts_at: datetime | None) -> None:
+        with self._cond:
+            if self.is_leader and self._apply(session_id, starts_at, self.clock()):
+                self._cond.notify()
+
+    def discard(self, session_id: int) -> None:
+        with self._cond:
+            self._pending.pop(session_id, None)
+
+    def _unclaimed(self, stmt):
+        return stmt.where(or_(SessionModel.reminded_starts_at.is_(None), SessionModel.reminded_starts_at != SessionModel.starts_at))
+
+    def refill(self) -> int:
+        now = self.clock()
+        horizon = now + self.lead + self.window
+        with self.session_factory() as db:
+            watermark = db.scalar(select(func.max(SessionModel.updated_at)))
+            rows = db.execute(self._unclaimed(
+                select(SessionModel.id, SessionModel.starts_at)
+                .where(SessionModel.starts_at > now - self.overlap, SessionModel.starts_at <= horizon)
+                .order_by(SessionModel.starts_at)
+            )).all()
+        with self._cond:
+            self._horizon = horizon
+            self._refilled_at = now
+            self._watermark = _as_utc(watermark) if watermark is not None else None
+            added = sum(self._apply(sid, ts, now) for sid, ts in rows)
+            self._cond.notify()
+        return added
+
+    def poll(self) -> int:
+        """Apply sessions written (by any process) since the last refill or poll."""
+        now = self.clock()
+        stmt = select(SessionModel.id, SessionModel.starts_at, SessionModel.updated_at)
+        if self._watermark is not None:
+            stmt = stmt.where(SessionModel.updated_at >= self._watermark - POLL_SLACK)
+        else:
+            stmt = stmt.where(SessionModel.updated_at.is_not(None))
+        with self.session_factory() as db:
+            rows = db.execute(self._unclaimed(stmt)).all()
+        with self._cond:
+            added = 0
+            for sid, ts, updated_at in rows:
+                updated_at = _as_utc(updated_at)
+                if self._watermark is None or updated_at > self._watermark:
+                    self._watermark = updated_at
+                added += self._apply(sid, ts, now)
+            if added:
+                self._cond.notify()
+        return added
+
+    # -- dispatch ---------------------------------------------------------
+
+    def _pop_due(self, now: datetime) -> list[tuple[int, datetime]]:
+        due = []
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                _, sid, starts_at = heapq.heappop(self._heap)
+                if self._pending.get(sid) != starts_at:
+                    continue
+                del self._pending[sid]
+                due.append((sid, starts_at))
+        return due
+
+    def _claim(self, session_id: int, starts_at: datetime) -> Reminder | None:
+        with self.session_factory() as db:
+            claimed = db.execute(
+                update(SessionModel)
+                .where(SessionModel.id == session_id, SessionModel.starts_at == starts_at)
+                .where(or_(SessionModel.reminded_starts_at.is_(None), SessionModel.reminded_starts_at != starts_at))
+                .values(reminded_starts_at=starts_at)
+            ).rowcount
+            if not claimed:
+                db.rollback()
+                return None
+            row = db.execute(
+                select(SessionModel.title, Subject.title, User.id, User.email)
+                .join(Week, SessionModel.week_id == Week.id)
+                .join(Subject, Week.subject_id == Subject.id)
+                .join(User, Subject.user_id == User.id)
+                .where(SessionModel.id == session_id)
+            ).first()
+            db.commit()
+        if row is None:
+            return None
+        return Reminder(session_id, row[0], row[1], row[2], row[3], starts_at)
+
+    def dispatch_due(self) -> int:
+        sent = 0
+        now = self.clock()
+        for sid, starts_at in self._pop_due(now):
+            try:
+                reminder = self._claim(sid, starts_at)
+            except Exception:
+                log.exception("claiming reminder for session %s failed; retrying", sid)
+                with self._cond:
+                    if sid not in self._pending:
+                        self._push(sid, starts_at, fire_at=now + self.retry)
+                continue
+            if reminder is None:
+                continue
+            try:
+                self.notifier.send(reminder)
+            except Exception:
+                log.exception("reminder for session %s failed; retrying", sid)
+                self._retry_send(sid, starts_at, now)
+                continue
+            sent += 1
+        return sent
+
+    def _retry_send(self, session_id: int, starts_at: datetime, now: datetime) -> None:
+        # Release the claim so this (or a later) leader can send it again.
+        try:
+            with self.session_factory() as db:
+                db.execute(
+                    update(SessionModel)
+                    .where(SessionModel.id == session_id, SessionModel.reminded_starts_at == starts_at)
+                    .values(reminded_starts_at=None)
+                )
+                db.commit()
+        except Exception:
+            log.exception("releasing reminder claim for session %s failed", session_id)
+            return
+        with self._cond:
+            if session_id not in self._pending:
+                self._push(session_id, starts_at, fire_at=now + self.retry)
+
+    # -- ORM hooks --------------------------------------------------------
+
+    def _after_flush(self, session, flush_context) -> None:
+        # Collected here, applied on commit: the rows aren't visible to the
+        # scheduler's own connection until then, and a rollback drops them.
+        changes = session.info.setdefault(self._info_key, [])
+        for obj in list(session.new) + list(session.dirty):
+            if isinstance(obj, SessionModel):
+                changes.append((obj.id, obj.starts_at, False))
+        for obj in session.deleted:
+            if isinstance(obj, SessionModel):
+                changes.append((obj.id, None, True))
+
+    def _after_commit(self, session) -> None:
+        for sid, starts_at, deleted in session.info.pop(self._info_key, []):
+            if deleted:
+                self.discard(sid)
+            else:
+                self.upsert(sid, starts_at)
+
+    def _after_rollback(self, session) -> None:
+        session.info.pop(self._info_key, None)
+
+    def attach(self) -> None:
+        event.listen(OrmSession, "after_flush", self._after_flush)
+        event.listen(OrmSession, "after_commit", self._after_commit)
+        event.listen(OrmSession, "after_rollback", self._after_rollback)
+
+    def detach(self) -> None:
+        event.remove(OrmSession, "after_flush", self._after_flush)
+        event.remove(OrmSession, "after_commit", self._after_commit)
+        event.remove(OrmSession, "after_rollback", self._after_rollback)
+
+    # -- lifecycle --------------------------------------------------------
+
+    def _set_leader(self, leader: bool) -> None:
+        with self._cond:
+            if leader == self.is_leader:
+                return
+            self.is_leader = leader
+            if not leader:
+                self._heap.clear()
+                self._pending.clear()
+                self._horizon = None
+                self._refilled_at = None
+                self._watermark = None
+        log.info("reminder scheduler %s leadership (%s)", "acquired" if leader else "lost", self.lease.holder)
+
+    def tick(self) -> datetime:
+        """Run one scheduling step and return when the next one is due."""
+        now = self.clock()
+        try:
+            self._set_leader(self.lease.acquire(now))
+        except Exception:
+            log.exception("reminder lease check failed")
+            self._set_leader(False)
+        renew_at = now + self.lease.ttl / 3
+        if not self.is_leader:
+            return renew_at
+        try:
+            if self._refilled_at is None or now >= self._refilled_at + self.window / 2:
+                self.refill()
+            else:
+                self.poll()
+            self.dispatch_due()
+        except Exception:
+            log.exception("reminder scheduling step failed")
+            return renew_at
+        wake = [renew_at]
+        with self._cond:
+            if self._heap:
+                wake.append(self._heap[0][0])
+        refill_at = self._refilled_at + self.window / 2
+        if refill_at > now:
+            wake.append(refill_at)
+        return min(wake)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                next_at = self.tick()
+            except Exception:
+                log.exception("reminder scheduler tick failed")
+                next_at = self.clock() + self.retry
+            with self._cond:
+                if self._stopping:
+                    return
+                timeout = max(0.0, (next_at - self.clock()).total_seconds())
+                self._cond.wait(timeout)
+                if self._stopping:
+                    return
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.attach()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join()
+        self._thread = None
+        self.detach()
+        if self.is_leader:
+            try:
+                self.lease.release()
+            except Exception:
+                log.exception("reminder lease release failed")
+        self._set_leader(False)
@@ -0,0 +1,287 @@
+
+"""In-process load test for the Taskwave API.
+
+Seeds a scratch database, drives the real ASGI app through httpx with
+concurrent clients and reports throughput, latency percentiles,
+queries-per-request and peak RSS per scenario. A signup_login request is
+one signup followed by one login.
+
+    python -m bench.run --users 50 --subjects 6 --concurrency 16 --json out.json
+    python -m bench.run --postgres-url postgresql+psycopg://... --compare out.json
+
+Every target database is dropped and recreated: never point it at real data.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from itertools import count
+from pathlib import Path
+
+_tmp = tempfile.TemporaryDirectory(prefix="taskwave-bench-")
+# Settings are read at import time, so isolate media and the default DB first.
+os.environ["MEDIA_ROOT"] = os.path.join(_tmp.name, "media")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'unused.db')}"
+
+import httpx  # noqa: E402
+from sqlalchemy import create_engine, event, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from app.main import app  # noqa: E402
+from app.core.deps import get_db  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from bench.seed import seed, PASSWORD  # noqa: E402
+
+PREFIX = settings.API_V1_PREFIX.rstrip("/")
+UPLOAD_BODY = os.urandom(64 * 1024)
+SCENARIOS = [
+    "signup_login",
+    "list_subjects",
+    "subject_weeks",
+    "week_sessions",
+    "list_materials",
+    "upload_material",
+    "upload_timetable",
+]
+
+class QueryCounter:
+    def __init__(self, engine) -> None:
+        self.n = 0
+        event.listen(engine, "before_cursor_execute", self._inc)
+
+    def _inc(self, *args) -> None:
+        self.n += 1
+
+def _make_engine(url: str):
+    if url.startswith("sqlite"):
+        return create_engine(url, connect_args={"check_same_thread": False, "timeout": 30}, future=True)
+    return create_engine(url, pool_pre_ping=True, future=True)
+
+def _reset_peak_rss() -> None:
+    # Linux only: writing 5 to clear_refs resets VmHWM so each scenario gets its own peak.
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+def _peak_rss_mb() -> float:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def _percentile(sorted_vals: list[float], pct: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    # Nearest-rank: the smallest value with at least pct% of samples at or below it.
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(pct / 100 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+class Workload:
+    def __init__(self, users) -> None:
+        self.users = users
+        self.tokens = {u.id: create_access_token(u.id) for u in users}
+        self.signups = count()
+
+    def _pick(self):
+        u = random.choice(self.users)
+        return u, {"Authorization": f"Bearer {self.tokens[u.id]}"}
+
+    async def signup_login(self, client: httpx.AsyncClient) -> list[httpx.Response]:
+        email = f"signup{next(self.signups)}-{os.getpid()}@example.com"
+        r1 = await client.post(f"{PREFIX}/auth/signup", json={"email": email, "password": PASSWORD, "name": "Bench"})
+        r2 = await client.post(f"{PREFIX}/auth/login", json={"email": email, "password": PASSWORD})
+        return [r1, r2]
+
+    async def list_subjects(self, client):
+        _, h = self._pick()
+        return [await client.get(f"{PREFIX}/subjects", headers=h)]
+
+    async def subject_weeks(self, client):
+        u, h = self._pick()
+        return [await client.get(f"{PREFIX}/subjects/{random.choice(u.subject_ids)}/weeks", headers=h)]
+
+    async def week_sessions(self, client):
+        u, h = self._pick()
+        return [await client.get(f"{PREFIX}/weeks/{random.choice(u.week_ids)}/sessions", headers=h)]
+
+    async def list_materials(self, client):
+        u, h = self._pick()
+        return [await client.get(f"{PREFIX}/subjects/{random.choice(u.subject_ids)}/materials", headers=h)]
+
+    async def upload_material(self, client):
+        u, h = self._pick()
+        return [await client.post(
+            f"{PREFIX}/materials/upload",
+            headers=h,
+            data={"subject_id": str(random.choice(u.subject_ids))},
+            files={"file": ("bench.pdf", UPLOAD_BODY, "application/pdf")},
+        )]
+
+    async def upload_timetable(self, client):
+        _, h = self._pick()
+        return [await client.post(
+            f"{PREFIX}/timetable/upload",
+            headers=h,
+            files={"file": ("timetable.png", UPLOAD_BODY, "image/png")},
+        )]
+
+async def run_scenario(name: str, workload: Workload, counter: QueryCounter, requests: int, concurrency: int) -> dict:
+    op = getattr(workload, name)
+    latencies: list[float] = []
+    errors = 0
+    remaining = count()
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        while next(remaining) < requests:
+            t0 = time.perf_counter()
+            try:
+                responses = await op(client)
+            except Exception:
+                errors += 1
+                continue
+            finally:
+                latencies.append((time.perf_counter() - t0) * 1000)
+            errors += sum(1 for r in responses if r.status_code >= 400)
+
+    # Unhandled route errors come back as 500s instead of aborting the run.
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        _reset_peak_rss()
+        q0 = counter.n
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+        queries = counter.n - q0
+
+    latencies.sort()
+    done = len(latencies)
+    return {
+        "scenario": name,
+        "requests": done,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(done / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "queries_per_request": round(queries / done, 2) if done else 0.0,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+def _probe(url: str) -> None:
+    engine = _make_engine(url)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    finally:
+        engine.dispose()
+
+def bench_database(url: str, args) -> list[dict]:
+    engine = _make_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+
+    def _get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    t0 = time.perf_counter()
+    with SessionLocal() as db:
+        users = seed(db, args.users, args.subjects, args.sessions, args.materials)
+    print(f"[{engine.dialect.name}] seeded {args.users} users x {args.subjects} subjects in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    counter = QueryCounter(engine)
+    workload = Workload(users)
+    app.dependency_overrides[get_db] = _get_db
+    results = []
+    try:
+        for name in args.scenarios:
+            requests = args.auth_requests if name == "signup_login" else args.requests
+            row = asyncio.run(run_scenario(name, workload, counter, requests, args.concurrency))
+            row["database"] = engine.dialect.name
+            results.append(row)
+            print(f"[{row['database']}] {name}: {row['requests']} requests in {row['elapsed_s']}s", file=sys.stderr)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        engine.dispose()
+    return results
+
+def _format_row(row: dict, base: dict | None = None) -> str:
+    s = (
+        f"{row['database']:<10} {row['scenario']:<17} {row['throughput_rps']:>9.1f} rps"
+        f"  p50 {row['p50_ms']:>8.2f}  p95 {row['p95_ms']:>8.2f}  p99 {row['p99_ms']:>8.2f} ms"
+        f"  {row['queries_per_request']:>5.2f} q/req  {row['peak_rss_mb']:>7.1f} MB  err {row['errors']}"
+    )
+    if base:
+        def delta(key: str) -> str:
+            return f"{(row[key] - base[key]) / base[key] * 100:+.1f}%" if base[key] else "n/a"
+        s += f"  | rps {delta('throughput_rps')} p95 {delta('p95_ms')} q/req {delta('queries_per_request')}"
+    return s
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--users", type=int, default=20)
+    p.add_argument("--subjects", type=int, default=5, help="subjects per user")
+    p.add_argument("--sessions", type=int, default=3, help="sessions per week")
+    p.add_argument("--materials", type=int, default=10, help="materials per subject")
+    p.add_argument("--requests", type=int, default=500, help="operations per scenario")
+    p.add_argument("--auth-requests", type=int, default=50, help="operations for signup_login (bcrypt bound)")
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    p.add_argument("--sqlite-url", default=f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}")
+    p.add_argument("--postgres-url", default=os.environ.get("BENCH_POSTGRES_URL"), help="scratch Postgres DB; skipped if unreachable")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--json", dest="json_out", help="write results to this file")
+    p.add_argument("--compare", help="previous --json output to diff against")
+    args = p.parse_args(argv)
+    if args.users < 1 or args.subjects < 1:
+        p.error("--users and --subjects must be at least 1")
+    random.seed(args.seed)
+
+    results = bench_database(args.sqlite_url, args)
+    if args.postgres_url:
+        # Only an unreachable server counts as "not available"; anything
+        # failing after that is a real error and must fail the run.
+        try:
+            _probe(args.postgres_url)
+        except Exception as e:
+            print(f"[postgres] skipped: {e}", file=sys.stderr)
+        else:
+            results += bench_database(args.postgres_url, args)
+
+    baseline = {}
+    if args.compare:
+        prev = json.loads(Path(args.compare).read_text())
+        baseline = {(r["database"], r["scenario"]): r for r in prev["results"]}
+    for row in results:
+        print(_format_row(row, baseline.get((row["database"], row["scenario"]))))
+
+    if args.json_out:
+        params = {k: getattr(args, k) for k in ("users", "subjects", "sessions", "materials", "requests", "auth_requests", "concurrency", "seed")}
+        report = {"params": params, "python": sys.version.split()[0], "timestamp": time.time(), "results": results}
+        Path(args.json_out).write_text(json.dumps(report, indent=2))
+    return 1 if any(r["errors"] for r in results) else 0
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    finally:
+        _tmp.cleanup()
@@ -0,0 +1,74 @@
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.core.security import hash_password
+from app.models.user import User
+from app.models.subject import Subject
+from app.models.schedule import Week, Session as SessionModel
+from app.models.material import Material
+
+WEEKS_PER_SUBJECT = 15
+PASSWORD = "bench-password"
+
+@dataclass
+class SeededUser:
+    id: str
+    email: str
+    subject_ids: list[int] = field(default_factory=list)
+    week_ids: list[int] = field(default_factory=list)
+
+def seed(
+    db: Session,
+    users: int,
+    subjects: int,
+    sessions: int,
+    materials: int,
+    term_start: datetime | None = None,
+) -> list[SeededUser]:
+    # bcrypt is deliberately slow; every seeded user shares one hash.
+    pw_hash = hash_password(PASSWORD)
+    term_start = term_start or datetime.now(timezone.utc).replace(hour=9, minute=0, second=0, microsecond=0)
+    out = [SeededUser(id=str(uuid4()), email=f"bench{i}@example.com") for i in range(users)]
+    db.execute(insert(User), [{"id": u.id, "email": u.email, "password_hash": pw_hash, "name": f"Bench {i}"} for i, u in enumerate(out)])
+
+    for u in out:
+        rows = [{"title": f"Subject {j + 1}", "user_id": u.id} for j in range(subjects)]
+        u.subject_ids = list(db.scalars(insert(Subject).returning(Subject.id, sort_by_parameter_order=True), rows)) if rows else []
+
+    week_rows = [{"subject_id": sid, "week_index": w} for u in out for sid in u.subject_ids for w in range(1, WEEKS_PER_SUBJECT + 1)]
+    week_ids = list(db.scalars(insert(Week).returning(Week.id, sort_by_parameter_order=True), week_rows)) if week_rows else []
+    per_user = subjects * WEEKS_PER_SUBJECT
+    for n, u in enumerate(out):
+        u.week_ids = week_ids[n * per_user:(n + 1) * per_user]
+
+    if sessions:
+        session_rows = []
+        for wid, wrow in zip(week_ids, week_rows):
+            day = term_start + timedelta(weeks=wrow["week_index"] - 1)
+            for k in range(sessions):
+                session_rows.append({
+                    "week_id": wid,
+                    "title": f"Session {k + 1}",
+                    "starts_at": day + timedelta(days=k % 5, hours=k // 5),
+                    "note": None,
+                })
+        db.execute(insert(SessionModel), session_rows)
+
+    if materials:
+        material_rows = [
+            {
+                "subject_id": sid,
+                "filename": f"material_{k + 1}.pdf",
+                "storage_path": f"materials/seed_{sid}_{k + 1}.pdf",
+                "content_type": "application/pdf",
+                "size_bytes": 1024,
+            }
+            for u in out for sid in u.subject_ids for k in range(materials)
+        ]
+        db.execute(insert(Material), material_rows)
+
+    db.commit()
+    return out
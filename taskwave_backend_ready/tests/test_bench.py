@@ -0,0 +1,66 @@
+
+import json
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from bench import run
+from bench.seed import seed, WEEKS_PER_SUBJECT
+from app.db.base import Base
+from app.models.user import User
+from app.models.subject import Subject
+from app.models.schedule import Week, Session as SessionModel
+from app.models.material import Material
+from app.routers import materials, uploads
+
+def test_percentile_is_nearest_rank():
+    vals = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert run._percentile(vals, 50) == 3.0
+    assert run._percentile(vals, 95) == 5.0
+    assert run._percentile(vals, 20) == 1.0
+    assert run._percentile(list(map(float, range(1, 51))), 95) == 48.0
+    assert run._percentile([], 50) == 0.0
+
+def test_seed_row_counts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        users = seed(db, users=2, subjects=3, sessions=2, materials=4)
+        count = lambda model: db.scalar(select(func.count()).select_from(model))
+        assert count(User) == 2
+        assert count(Subject) == 2 * 3
+        assert count(Week) == 2 * 3 * WEEKS_PER_SUBJECT
+        assert count(SessionModel) == 2 * 3 * WEEKS_PER_SUBJECT * 2
+        assert count(Material) == 2 * 3 * 4
+    assert all(len(u.week_ids) == 3 * WEEKS_PER_SUBJECT for u in users)
+    engine.dispose()
+
+def test_main_end_to_end(tmp_path, monkeypatch):
+    monkeypatch.delenv("BENCH_POSTGRES_URL", raising=False)
+    for mod in (materials, uploads):
+        monkeypatch.setattr(mod.storage, "media_root", tmp_path / "media")
+    out = tmp_path / "out.json"
+    rc = run.main([
+        "--users", "1", "--subjects", "1", "--sessions", "1", "--materials", "1",
+        "--requests", "4", "--auth-requests", "1", "--concurrency", "2",
+        "--sqlite-url", f"sqlite:///{tmp_path / 'bench.db'}", "--json", str(out),
+    ])
+    assert rc == 0
+    report = json.loads(out.read_text())
+    assert [r["scenario"] for r in report["results"]] == run.SCENARIOS
+    assert all(r["errors"] == 0 and r["requests"] > 0 for r in report["results"])
+
+def test_postgres_failure_after_connect_is_not_skipped(tmp_path, monkeypatch):
+    monkeypatch.setattr(run, "_probe", lambda url: None)
+    real = run.bench_database
+
+    def bench_database(url, args):
+        if url.startswith("postgresql"):
+            raise RuntimeError("seeding failed")
+        return real(url, args)
+
+    monkeypatch.setattr(run, "bench_database", bench_database)
+    with pytest.raises(RuntimeError):
+        run.main([
+            "--users", "1", "--subjects", "1", "--requests", "2", "--scenarios", "list_subjects",
+            "--sqlite-url", f"sqlite:///{tmp_path / 'bench.db'}", "--postgres-url", "postgresql+psycopg://x@127.0.0.1:1/none",
+        ])
@@ -0,0 +1,257 @@
+
+from datetime import datetime, timedelta, timezone
+import threading
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.models.user import User
+from app.models.subject import Subject
+from app.models.schedule import Week, Session as SessionModel
+from app.services.reminders import ReminderScheduler, InMemoryNotifier, DbLease
+
+T0 = datetime(2026, 3, 2, 9, 0, tzinfo=timezone.utc)
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = T0
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, minutes: float) -> None:
+        self.now += timedelta(minutes=minutes)
+
+@pytest.fixture
+def db_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reminders.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+@pytest.fixture
+def week_id(db_factory):
+    with db_factory() as db:
+        u = User(email="student@example.com", password_hash="x")
+        db.add(u); db.flush()
+        s = Subject(title="Algorithms", user_id=u.id)
+        db.add(s); db.flush()
+        w = Week(subject_id=s.id, week_index=1)
+        db.add(w); db.commit()
+        return w.id
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+@pytest.fixture
+def make_scheduler(db_factory, clock):
+    attached = []
+
+    def make(attach: bool = False) -> ReminderScheduler:
+        sch = ReminderScheduler(
+            InMemoryNotifier(), session_factory=db_factory, lease=DbLease(db_factory, ttl_seconds=30),
+            lead_minutes=10, window_minutes=60, clock=clock,
+        )
+        if attach:
+            sch.attach(); attached.append(sch)
+        return sch
+
+    yield make
+    for sch in attached:
+        sch.detach()
+
+def add_sessions(db_factory, week_id, *minutes) -> list[int]:
+    # Core insert: no ORM events, i.e. what the scheduler sees from another process.
+    with db_factory() as db:
+        ids = [db.scalar(insert(SessionModel).returning(SessionModel.id), {
+            "week_id": week_id, "title": f"at+{m}", "starts_at": T0 + timedelta(minutes=m),
+        }) for m in minutes]
+        db.commit()
+    return ids
+
+def sent_titles(sch) -> list[str]:
+    return [r.session_title for r in sch.notifier.sent]
+
+def test_refill_loads_only_window(db_factory, week_id, make_scheduler):
+    add_sessions(db_factory, week_id, -60, 5, 30, 70, 200)
+    sch = make_scheduler()
+    sch.tick()
+    assert sorted(sch._pending.values()) == [T0 + timedelta(minutes=m) for m in (30, 70)]
+    assert sent_titles(sch) == ["at+5"]
+
+def test_in_process_writes_update_heap_after_commit(db_factory, week_id, make_scheduler):
+    sch = make_scheduler(attach=True)
+    sch.tick()
+    with db_factory() as db:
+        s = SessionModel(week_id=week_id, title="new", starts_at=T0 + timedelta(minutes=40))
+        db.add(s); db.flush()
+        assert s.id not in sch._pending
+        db.commit()
+        sid = s.id
+        assert sch._pending[sid] == T0 + timedelta(minutes=40)
+
+        s.starts_at = T0 + timedelta(minutes=50); db.commit()
+        assert sch._pending[sid] == T0 + timedelta(minutes=50)
+
+        s.starts_at = T0 + timedelta(minutes=20); db.flush(); db.rollback()
+        assert sch._pending[sid] == T0 + timedelta(minutes=50)
+
+        db.delete(db.get(SessionModel, sid)); db.commit()
+        assert sid not in sch._pending
+
+def test_second_lease_holder_gets_nothing(db_factory, week_id, make_scheduler, clock):
+    add_sessions(db_factory, week_id, 5, 30)
+    a, b = make_scheduler(), make_scheduler()
+    a.tick(); b.tick()
+    assert a.is_leader and not b.is_leader
+    assert not b._pending
+    clock.advance(25)
+    a.tick(); b.tick()
+    assert sent_titles(a) == ["at+5", "at+30"]
+    assert sent_titles(b) == []
+
+def test_new_leader_does_not_resend_claimed(db_factory, week_id, make_scheduler, clock):
+    add_sessions(db_factory, week_id, 5, 30)
+    a, b = make_scheduler(), make_scheduler()
+    a.tick()
+    assert sent_titles(a) == ["at+5"]
+    clock.advance(0.25)
+    b.tick()
+    assert not b.is_leader
+    # a stops renewing; b takes over once the 30s lease expires.
+    clock.advance(0.5)
+    b.tick()
+    assert b.is_leader and sent_titles(b) == []
+    clock.advance(20)
+    b.tick()
+    assert b.is_leader
+    assert sent_titles(b) == ["at+30"]
+    assert "at+5" not in sent_titles(b)
+
+def test_cross_process_insert_is_polled(db_factory, week_id, make_scheduler, clock):
+    sch = make_scheduler()
+    sch.tick()
+    add_sessions(db_factory, week_id, 24)
+    for _ in range(4):
+        clock.advance(5)
+        sch.tick()
+    assert sent_titles(sch) == ["at+24"]
+
+def test_cross_process_move_earlier(db_factory, week_id, make_scheduler, clock):
+    (sid,) = add_sessions(db_factory, week_id, 50)
+    sch = make_scheduler()
+    sch.tick()
+    with db_factory() as db:
+        db.get(SessionModel, sid).starts_at = T0 + timedelta(minutes=8)
+        db.commit()
+    clock.advance(0.5)
+    sch.tick()
+    assert sent_titles(sch) == ["at+50"]
+    assert sch.notifier.sent[0].starts_at == T0 + timedelta(minutes=8)
+
+def test_recently_started_session_sent_late(db_factory, week_id, make_scheduler):
+    add_sessions(db_factory, week_id, -0.25)
+    sch = make_scheduler()
+    sch.tick()
+    assert sent_titles(sch) == ["at+-0.25"]
+
+def test_refill_error_keeps_scheduler_running(db_factory, week_id, make_scheduler, clock, monkeypatch):
+    add_sessions(db_factory, week_id, 5)
+    sch = make_scheduler()
+    real_refill = sch.refill
+    calls = []
+
+    def flaky_refill():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OperationalError("SELECT", {}, Exception("database is locked"))
+        return real_refill()
+
+    monkeypatch.setattr(sch, "refill", flaky_refill)
+    sch.tick()
+    assert sch.is_leader and sent_titles(sch) == []
+    sch.tick()
+    assert sent_titles(sch) == ["at+5"]
+
+def test_claim_error_is_retried(db_factory, week_id, make_scheduler, clock, monkeypatch):
+    add_sessions(db_factory, week_id, 5)
+    sch = make_scheduler()
+    real_claim = sch._claim
+    calls = []
+
+    def flaky_claim(sid, starts_at):
+        calls.append(1)
+        if len(calls) == 1:
+            raise OperationalError("UPDATE", {}, Exception("database is locked"))
+        return real_claim(sid, starts_at)
+
+    monkeypatch.setattr(sch, "_claim", flaky_claim)
+    sch.tick()
+    assert sent_titles(sch) == []
+    clock.advance(1)
+    sch.tick()
+    assert sent_titles(sch) == ["at+5"]
+
+class FlakyNotifier(InMemoryNotifier):
+    def __init__(self) -> None:
+        super().__init__()
+        self.failures = 1
+
+    def send(self, reminder) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("smtp down")
+        super().send(reminder)
+
+def test_send_error_releases_claim_and_retries(db_factory, week_id, make_scheduler, clock):
+    (sid,) = add_sessions(db_factory, week_id, 5)
+    sch = make_scheduler()
+    sch.notifier = FlakyNotifier()
+    sch.tick()
+    assert sent_titles(sch) == []
+    with db_factory() as db:
+        assert db.get(SessionModel, sid).reminded_starts_at is None
+    clock.advance(1)
+    sch.tick()
+    assert sent_titles(sch) == ["at+5"]
+    clock.advance(1)
+    sch.tick()
+    assert sent_titles(sch) == ["at+5"]
+
+def test_non_utc_starts_at_is_stored_as_utc(db_factory, week_id, make_scheduler, clock):
+    kst = timezone(timedelta(hours=9))
+    starts_at = (T0 + timedelta(minutes=30)).astimezone(kst)
+    with db_factory() as db:
+        db.add(SessionModel(week_id=week_id, title="kst", starts_at=starts_at))
+        db.commit()
+    sch = make_scheduler()
+    sch.tick()
+    assert list(sch._pending.values()) == [T0 + timedelta(minutes=30)]
+    clock.advance(19)
+    sch.tick()
+    assert sent_titles(sch) == []
+    clock.advance(1)
+    sch.tick()
+    assert sent_titles(sch) == ["kst"]
+    assert sch.notifier.sent[0].starts_at == starts_at
+
+def test_thread_survives_tick_errors(make_scheduler, monkeypatch):
+    sch = make_scheduler()
+    ticked = threading.Event()
+
+    def broken_tick():
+        ticked.set()
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(sch, "tick", broken_tick)
+    sch.retry = timedelta(0)
+    sch.start()
+    try:
+        assert ticked.wait(2)
+        ticked.clear()
+        assert ticked.wait(2)
+        assert sch._thread.is_alive()
+    finally:
+        sch.stop()